@@ -1,6 +1,6 @@
 """
 Module Name: omxerr.py
-Python Version: 2.7.6
+Python Version: 2.7.6, 3.x
 
 Standard OMX Error Class
 
@@ -9,6 +9,9 @@ Copyright (c) 2014 Binh Bui
 Redistribution and use in source and binary forms, with or without
 modification, are permitted.
 """
+
+from __future__ import print_function
+
 #===============================================================================
 #  Copyright (c) 2008 The Khronos Group Inc. 
 #  
@@ -133,6 +136,6 @@ class OMXError(object):
                 if l > 0:
                     error_name += ' (%s)' % hex(e)
 
-            print s, error_name
+            print(s, error_name)
 
 
@@ -1,7 +1,7 @@
 """
 Module Name: omxilc.py
 Version: 1.2 (2014-10-19)
-Python Version: 2.7.3
+Python Version: 2.7.3, 3.x
 
 This module defines classes for writing OMX IL client applications.
 It is based on the file ilclient.c developed by Broadcom which defines an IL
@@ -13,6 +13,9 @@ Copyright (c) 2014 Binh Bui
 Redistribution and use in source and binary forms, with or without
 modification, are permitted.
 """
+
+from __future__ import division, print_function
+
 #===============================================================================
 #  ilclient.c
 #
@@ -160,9 +163,7 @@ if _verbose:
         while _cons_print_locked:
             time.sleep(0.001)
         _cons_print_locked = 1
-        for arg in args:
-            print arg,
-        print ''
+        print(*args)
         _cons_print_locked = 0
 else:
     def cons_print(*args):
@@ -200,6 +201,7 @@ def _defEventHandler(cv_handle, cp_app_data, event, data1, data2, cp_event_data)
 
     cp_comp = ctypes.cast(cp_app_data, pCOMPONENT_CBDT)
     c_comp = cp_comp[0]
+    comp_name = c_comp.name.decode()
 
     if event == OMX_EventCmdComplete:
         c_comp.cmd_complete = 1
@@ -209,49 +211,51 @@ def _defEventHandler(cv_handle, cp_app_data, event, data1, data2, cp_event_data)
         if data1 == OMX_CommandStateSet:
             c_comp.current_state = data2    # state reached
             cons_print('%s event: Now in %s.' %
-                (c_comp.name, omx_state_names[data2]))
+                (comp_name, omx_state_names[data2]))
 
         elif data1 == OMX_CommandFlush:
             c_comp.port_flushed = data2
-            cons_print('%s event: Port %d flushed.' % (c_comp.name, data2))
+            cons_print('%s event: Port %d flushed.' % (comp_name, data2))
 
         elif data1 == OMX_CommandPortDisable:
             c_comp.port_disabled = data2
             if data2 == c_comp.port_enabled:
                 c_comp.port_enabled = 0
-            cons_print('%s event: Port %d disabled.' % (c_comp.name, data2))
+            cons_print('%s event: Port %d disabled.' % (comp_name, data2))
 
         elif data1 == OMX_CommandPortEnable:
             c_comp.port_enabled = data2
             if data2 == c_comp.port_disabled:
                 c_comp.port_disabled = 0
-            cons_print('%s event: Port %d enabled.' % (c_comp.name, data2))
+            cons_print('%s event: Port %d enabled.' % (comp_name, data2))
 
         elif data1 == OMX_CommandMarkBuffer:
             c_comp.port_buf_marked = data2
             cons_print('%s event: Buffer marked by port %d.' %
-                (c_comp.name, data2))
+                (comp_name, data2))
 
     elif event == OMX_EventError:
         c_comp.event_error = data1
         if data1 == OMX_ErrorSameState:
-            cons_print_error(data1, c_comp.name + ' event', ' ' + c_comp.method)
+            cons_print_error(data1, comp_name + ' event',
+                             ' ' + c_comp.method.decode())
         else:
-            print_error(data1, c_comp.name + ' event', ' ' + c_comp.method)
+            print_error(data1, comp_name + ' event',
+                        ' ' + c_comp.method.decode())
 
     elif event == OMX_EventMark:
-        cons_print('%s event: Marked buffer received.' % c_comp.name)
+        cons_print('%s event: Marked buffer received.' % comp_name)
 
     elif event == OMX_EventPortSettingsChanged:
         c_comp.port_changed = data1
-        cons_print('%s event: Port %d settings changed.' % (c_comp.name, data1))
+        cons_print('%s event: Port %d settings changed.' % (comp_name, data1))
 
     elif event == OMX_EventBufferFlag:
         c_comp.port_eos = data1
-        cons_print('%s event: EOS detected by port %d.' % (c_comp.name, data1))
+        cons_print('%s event: EOS detected by port %d.' % (comp_name, data1))
 
     else:
-        cons_print('%s event:' % c_comp.name, event, data1, data2)
+        cons_print('%s event:' % comp_name, event, data1, data2)
 
     return OMX_ErrorNone
 
@@ -267,7 +271,7 @@ def _defEmptyBufferDone(cv_handle, cp_app_data, cp_buffer):
     cp_comp[0].port_emptied = cp_app[0].port_index
 
     cons_print('%s callback: Port %d buffer %d emptied (%d bytes left).' %
-        (cp_comp[0].name, cp_app[0].port_index, cp_app[0].buffer_index,
+        (cp_comp[0].name.decode(), cp_app[0].port_index, cp_app[0].buffer_index,
          cp_buffer[0].nFilledLen))
 
     return OMX_ErrorNone
@@ -276,7 +280,8 @@ def _defEmptyBufferDoneError(cv_handle, cp_app_data, cp_buffer):
 
     cp_comp = ctypes.cast(cp_app_data, pCOMPONENT_CBDT)
 
-    cons_print('%s callback: EmptyBuffer done error.' % cp_comp[0].name)
+    cons_print('%s callback: EmptyBuffer done error.' %
+        cp_comp[0].name.decode())
 
     return OMX_ErrorNone
 
@@ -292,7 +297,7 @@ def _defFillBufferDone(cv_handle, cp_app_data, cp_buffer):
     cp_comp[0].port_filled = cp_app[0].port_index
 
     cons_print('%s callback: Port %d buffer %d filled (%d bytes).' %
-        (cp_comp[0].name, cp_app[0].port_index, cp_app[0].buffer_index,
+        (cp_comp[0].name.decode(), cp_app[0].port_index, cp_app[0].buffer_index,
          cp_buffer[0].nFilledLen))
 
     return OMX_ErrorNone
@@ -301,7 +306,7 @@ def _defFillBufferDoneError(cv_handle, cp_app_data, cp_buffer):
 
     cp_comp = ctypes.cast(cp_app_data, pCOMPONENT_CBDT)
 
-    cons_print('%s callback: FillBuffer done error.' % cp_comp[0].name)
+    cons_print('%s callback: FillBuffer done error.' % cp_comp[0].name.decode())
 
     return OMX_ErrorNone
 
@@ -331,23 +336,32 @@ class omxComponent(object):
         # Create a C structure of component data that will be returned by
         # callbacks for identifying source and updating its data.
         self.c_app_data = COMPONENT_CBDT()
-        self.c_app_data.name = self.name[:31]
+        self.c_app_data.name = self.name[:31].encode()
+
+        # Optional Python functions invoked after the default callbacks have
+        # updated the component data, e.g. to signal a waiting thread.
+        #   on_event(event, data1, data2)
+        #   on_empty_done(port_index, buffer_index, filled_len)
+        #   on_fill_done(port_index, buffer_index, filled_len)
+        self.on_event = None
+        self.on_empty_done = None
+        self.on_fill_done = None
 
         # Create a C structure of default callback functions.
         self.c_callbacks = OMX_CALLBACKTYPE()
 
-        cfp = CFP_EVENT_HANDLER(_defEventHandler)
+        cfp = CFP_EVENT_HANDLER(self.cbEventHandler)
         self.c_callbacks.EventHandler = cfp
 
         if self.flags & ILCLIENT_ENABLE_INPUT_BUFFERS:
-            cfp = CFP_EMPTY_BUFFER_DONE(_defEmptyBufferDone)
+            cfp = CFP_EMPTY_BUFFER_DONE(self.cbEmptyBufferDone)
             self.c_callbacks.EmptyBufferDone = cfp
         else:
             cfp = CFP_EMPTY_BUFFER_DONE(_defEmptyBufferDoneError)
             self.c_callbacks.EmptyBufferDone = cfp
 
         if self.flags & ILCLIENT_ENABLE_OUTPUT_BUFFERS:
-            cfp = CFP_FILL_BUFFER_DONE(_defFillBufferDone)
+            cfp = CFP_FILL_BUFFER_DONE(self.cbFillBufferDone)
             self.c_callbacks.FillBufferDone = cfp
         else:
             cfp = CFP_FILL_BUFFER_DONE(_defFillBufferDoneError)
@@ -388,7 +402,7 @@ class omxComponent(object):
             if c_port_param.nPorts <= 0:    # This domain has no ports.
                 continue
 
-            for n in xrange(c_port_param.nPorts):
+            for n in range(c_port_param.nPorts):
                 port_index = c_port_param.nStartPortNumber + n
 
                 # Save port index.
@@ -433,13 +447,13 @@ class omxComponent(object):
         Open the component.
         """
 
-        self.c_app_data.method = 'Open'
+        self.c_app_data.method = b'Open'
 
 #        cons_print('%s: Creating component...' % self.name)
 
         # Add required prefix to component name.
-        c_component_name = ctypes.create_string_buffer('OMX.broadcom.' +
-                                                       self.name)
+        c_component_name = ctypes.create_string_buffer(
+                ('OMX.broadcom.' + self.name).encode())
 
         # Create instance of component specified by name given.
         cv_handle = OMX_HANDLETYPE()    # component handle
@@ -450,7 +464,7 @@ class omxComponent(object):
                 ctypes.byref(self.c_callbacks))
 
         if e != OMX_ErrorNone:
-            print '%s: Component not created.' % self.name
+            print('%s: Component not created.' % self.name)
             return
 
         cons_print('%s: Component created.' % self.name)
@@ -516,7 +530,7 @@ class omxComponent(object):
         """
 
         for domain_name in omx_component_domain_names:
-            for n in xrange(self.num_ports[domain_name]):
+            for n in range(self.num_ports[domain_name]):
                 key = '%s%d' % (domain_name, n+1)
                 self.DisablePort(self.port_indices[key], timeout)
 
@@ -758,6 +772,53 @@ class omxComponent(object):
         self.c_app_data.port_filled = 0
         self.c_app_data.event_error = OMX_ErrorNone
 
+    #---------------------------------------------------------------------------
+    # Callback Methods
+    # These methods call the default callbacks, then the optional Python
+    # functions on_event, on_empty_done and on_fill_done if they are set.
+    #---------------------------------------------------------------------------
+
+    def cbEventHandler(self, cv_handle, cp_app_data, event, data1, data2,
+                       cp_event_data):
+        """
+        EventHandler callback of the component.
+        """
+
+        e = _defEventHandler(cv_handle, cp_app_data, event, data1, data2,
+                             cp_event_data)
+        if self.on_event is not None:
+            self.on_event(event, data1, data2)
+
+        return e
+
+    #---------------------------------------------------------------------------
+    def cbEmptyBufferDone(self, cv_handle, cp_app_data, cp_buffer):
+        """
+        EmptyBufferDone callback of the component.
+        """
+
+        e = _defEmptyBufferDone(cv_handle, cp_app_data, cp_buffer)
+        if self.on_empty_done is not None:
+            c_app = ctypes.cast(cp_buffer[0].pAppPrivate, pBUFHDR_APPT)[0]
+            self.on_empty_done(c_app.port_index, c_app.buffer_index,
+                               cp_buffer[0].nFilledLen)
+
+        return e
+
+    #---------------------------------------------------------------------------
+    def cbFillBufferDone(self, cv_handle, cp_app_data, cp_buffer):
+        """
+        FillBufferDone callback of the component.
+        """
+
+        e = _defFillBufferDone(cv_handle, cp_app_data, cp_buffer)
+        if self.on_fill_done is not None:
+            c_app = ctypes.cast(cp_buffer[0].pAppPrivate, pBUFHDR_APPT)[0]
+            self.on_fill_done(c_app.port_index, c_app.buffer_index,
+                              cp_buffer[0].nFilledLen)
+
+        return e
+
     #---------------------------------------------------------------------------
     def PlaceOutTunnel(self, out_port, sink_component, sink_port):
         """
@@ -819,7 +880,7 @@ class omxComponent(object):
         print_error(e, self.name, 'OMX_SetupTunnel')
         if e == OMX_ErrorNone:
             cons_print('%s: Tunnel from port %d to port %d of %s removed.' %
-                (self.name, out_port, sink_port, sink.name))
+                (self.name, out_port, sink_port, sink.name.decode()))
             self.c_app_data.out_tunnel_port = 0
             sink.in_tunnel_port = 0
             sink.source = pCOMPONENT_CBDT()
@@ -960,7 +1021,7 @@ class omxComponent(object):
             <c_pointer> Array of pointers to ctypes.c_char buffers.
         """
 
-        self.c_app_data.method = 'SupplyAllBuffers'
+        self.c_app_data.method = b'SupplyAllBuffers'
 
         CP = ctypes.c_char*buffer_size
         CPP = ctypes.POINTER(CP)
@@ -1001,7 +1062,7 @@ class omxComponent(object):
                 del self.c_out_buf_hdr_prv_list
                 self.c_out_buf_hdr_prv_list = []
 
-        for n in xrange(c_port_def.nBufferCountActual):
+        for n in range(c_port_def.nBufferCountActual):
             if c_port_def.eDir == OMX_DirInput:
                 # Allocate a port buffer.
                 self.c_in_buf_list.append(CP())
@@ -1070,7 +1131,7 @@ class omxComponent(object):
             <c_pointer> Array of pointers to c_char buffers.
         """
 
-        self.c_app_data.method = 'AllocateAllBuffers'
+        self.c_app_data.method = b'AllocateAllBuffers'
 
         CPP = ctypes.POINTER(ctypes.c_char*buffer_size)
 
@@ -1109,7 +1170,7 @@ class omxComponent(object):
                 del self.c_out_buf_hdr_prv_list
                 self.c_out_buf_hdr_prv_list = []
 
-        for n in xrange(c_port_def.nBufferCountActual):
+        for n in range(c_port_def.nBufferCountActual):
             if c_port_def.eDir == OMX_DirInput:
                 # Allocate a private structure for port buffer header.
                 self.c_in_buf_hdr_prv_list.append(BUFHDR_APPT())
@@ -1244,7 +1305,7 @@ class omxComponent(object):
             <int>       Version of component.
             <int>       Version of OpenMAX IL specification against which the
                         component was built.
-            <str>       UUID of component (128 bytes).
+            <bytes>     UUID of component (128 bytes).
         """
 
         c_comp_name = (ctypes.c_char*128)()
@@ -1259,7 +1320,7 @@ class omxComponent(object):
         print_error(e, self.name, 'GetComponentVersion')
 
         return (e,
-                c_comp_name.value,
+                c_comp_name.value.decode(),
                 c_comp_version.nVersion,
                 c_spec_version.nVersion,
                 ctypes.cast(c_comp_uuid, OMX_STRING)[:len(c_comp_uuid)])
@@ -1437,8 +1498,8 @@ class omxComponent(object):
             <int>       OMX structure index.
         """
 
-        c_param_name = ctypes.create_string_buffer(param_name, 128)
-        c_param_name[-1] = '\x00'
+        c_param_name = ctypes.create_string_buffer(param_name.encode(), 128)
+        c_param_name[-1] = b'\x00'
 
         c_index = OMX_INDEXTYPE()
         e = self.c_handle[0].GetExtensionIndex(self.cv_handle,
@@ -1574,7 +1635,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'EmptyThisBuffer'
+        self.c_app_data.method = b'EmptyThisBuffer'
 
         e = self.c_handle[0].EmptyThisBuffer(self.cv_handle,
                 cp_buffer_hdr)
@@ -1596,7 +1657,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'FillThisBuffer'
+        self.c_app_data.method = b'FillThisBuffer'
 
         e = self.c_handle[0].FillThisBuffer(self.cv_handle,
                 cp_buffer_hdr)
@@ -1735,7 +1796,7 @@ class omxComponent(object):
         print_error(e, self.name, 'ComponentRoleEnum')
 
         return (e,
-                c_role_name.value)
+                c_role_name.value.decode())
 
     #---------------------------------------------------------------------------
     # Send Commands
@@ -1755,7 +1816,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'ChangeState'
+        self.c_app_data.method = b'ChangeState'
 
         cons_print('%s: Going to %s...' %
                    (self.name, omx_state_names[state]))
@@ -1780,7 +1841,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'FlushPort'
+        self.c_app_data.method = b'FlushPort'
         self.c_app_data.port_flushed = 0
 
 #        cons_print('%s: Flushing port %d...' % (self.name, port_index))
@@ -1805,7 +1866,7 @@ class omxComponent(object):
             <int>       Error code.
         """
         
-        self.c_app_data.method = 'DisablePort'
+        self.c_app_data.method = b'DisablePort'
         self.c_app_data.port_disabled = 0
 
 #        cons_print('%s: Disabling port %d...' % (self.name, port_index))
@@ -1830,7 +1891,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'EnablePort'
+        self.c_app_data.method = b'EnablePort'
         self.c_app_data.port_enabled = 0
 
 #        cons_print('%s: Enabling port %d...' % (self.name, port_index))
@@ -1853,7 +1914,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'MarkBuffer'
+        self.c_app_data.method = b'MarkBuffer'
         self.c_app_data.port_buf_marked = 0
 
         cons_print('%s: Port %d marking buffer...' % (self.name, port_index))
@@ -1881,7 +1942,7 @@ class omxComponent(object):
             <c_struct>  OMX_PORT_PARAM_TYPE structure
         """
 
-        self.c_app_data.method = 'GetPorts'
+        self.c_app_data.method = b'GetPorts'
 
         c_port_param = OMX_PORT_PARAM_TYPE()
         e = self.GetParameter(port_domain, ctypes.pointer(c_port_param))
@@ -1911,7 +1972,7 @@ class omxComponent(object):
             <c_struct>  OMX_PARAM_PORTDEFINITIONTYPE structure
         """
 
-        self.c_app_data.method = 'GetPortDefinition'
+        self.c_app_data.method = b'GetPortDefinition'
 
 #        cons_print('%s: Getting port %d definition...' %
 #                   (self.name, port_index))
@@ -1938,7 +1999,7 @@ class omxComponent(object):
             <int>       Number of available streams.
         """
 
-        self.c_app_data.method = 'GetNumberStreams'
+        self.c_app_data.method = b'GetNumberStreams'
 
         c_param = OMX_PARAM_U32TYPE()
         c_param.nPortIndex = port_index
@@ -1963,7 +2024,7 @@ class omxComponent(object):
             <int>       Active stream index.
         """
 
-        self.c_app_data.method = 'GetActiveStream'
+        self.c_app_data.method = b'GetActiveStream'
 
         c_param = OMX_PARAM_U32TYPE()
         c_param.nPortIndex = port_index
@@ -1988,7 +2049,7 @@ class omxComponent(object):
             <int>       Buffer supplier code (0=unspecified, 1=input, 2=output).
         """
 
-        self.c_app_data.method = 'GetBufferSupplier'
+        self.c_app_data.method = b'GetBufferSupplier'
 
         c_param = OMX_PARAM_BUFFERSUPPLIERTYPE()
         c_param.nPortIndex = port_index
@@ -2017,7 +2078,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'SetPortDefinition'
+        self.c_app_data.method = b'SetPortDefinition'
 
 #        type_names = ('audio', 'video', 'image', 'other')
 #        cons_print('%s: Setting %s port %d definition...' %
@@ -2044,7 +2105,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'SetBufferCount'
+        self.c_app_data.method = b'SetBufferCount'
 
         e, c_port_def = self.GetPortDefinition(port_index)
         if e != OMX_ErrorNone:
@@ -2052,7 +2113,8 @@ class omxComponent(object):
 
         if buffer_count < c_port_def.nBufferCountMin:
             cons_print('%s.%s: Buffer count must be >= %d.' %
-                (self.name, self.c_app_data.method, c_port_def.nBufferCountMin))
+                (self.name, self.c_app_data.method.decode(),
+                 c_port_def.nBufferCountMin))
             return e
         
         c_port_def.nBufferCountActual = buffer_count
@@ -2069,7 +2131,7 @@ class omxComponent(object):
             port_index      <int>       Index of port to zero buffer count.
         """
 
-        self.c_app_data.method = 'ZeroOutBufferCount'
+        self.c_app_data.method = b'ZeroOutBufferCount'
 
         e, c_port_def = self.GetPortDefinition(port_index)
         if e != OMX_ErrorNone:
@@ -2088,10 +2150,10 @@ class omxComponent(object):
         Zero the actual buffer count of all output ports.
         """
 
-        self.c_app_data.method = 'ZeroAllOutBufferCounts'
+        self.c_app_data.method = b'ZeroAllOutBufferCounts'
 
         for domain_name in omx_component_domain_names:
-            for n in xrange(self.num_out_ports[domain_name]):
+            for n in range(self.num_out_ports[domain_name]):
                 key = '%s%d' % (domain_name, n+1)
                 self.ZeroOutBufferCount(self.out_port_indices[key])
 
@@ -2108,13 +2170,13 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'SetAudioPortFormat'
+        self.c_app_data.method = b'SetAudioPortFormat'
 
         if self.num_ports['Audio'] <= 0:
-            print '%s: Component has no audio port.' % self.name
+            print('%s: Component has no audio port.' % self.name)
             return OMX_ErrorNone
 
-        for n in xrange(self.num_ports['Audio']):
+        for n in range(self.num_ports['Audio']):
             key = 'Audio%d' % (n+1)
             if port_index != self.port_indices[key]:
                 continue
@@ -2132,7 +2194,7 @@ class omxComponent(object):
 
             return e
 
-        print '%s: Port %d is not an audio port.' % (self.name, port_index)
+        print('%s: Port %d is not an audio port.' % (self.name, port_index))
         return OMX_ErrorBadPortIndex
 
     #---------------------------------------------------------------------------
@@ -2149,13 +2211,13 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'SetImagePortFormat'
+        self.c_app_data.method = b'SetImagePortFormat'
 
         if self.num_ports['Image'] <= 0:
-            print '%s: Component has no image port.' % self.name
+            print('%s: Component has no image port.' % self.name)
             return OMX_ErrorNone
 
-        for n in xrange(self.num_ports['Image']):
+        for n in range(self.num_ports['Image']):
             key = 'Image%d' % (n+1)
             if port_index != self.port_indices[key]:
                 continue
@@ -2174,7 +2236,7 @@ class omxComponent(object):
 
             return e
 
-        print '%s: Port %d is not an image port.' % (self.name, port_index)
+        print('%s: Port %d is not an image port.' % (self.name, port_index))
         return OMX_ErrorBadPortIndex
 
     #---------------------------------------------------------------------------
@@ -2192,13 +2254,13 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'SetVideoPortFormat'
+        self.c_app_data.method = b'SetVideoPortFormat'
 
         if self.num_ports['Video'] <= 0:
-            print '%s: Component has no video port.' % self.name
+            print('%s: Component has no video port.' % self.name)
             return OMX_ErrorNone
 
-        for n in xrange(self.num_ports['Video']):
+        for n in range(self.num_ports['Video']):
             key = 'Video%d' % (n+1)
             if port_index != self.port_indices[key]:
                 continue
@@ -2218,7 +2280,7 @@ class omxComponent(object):
 
             return e
 
-        print '%s: Port %d is not a video port.' % (self.name, port_index)
+        print('%s: Port %d is not a video port.' % (self.name, port_index))
         return OMX_ErrorBadPortIndex
 
     #---------------------------------------------------------------------------
@@ -2234,13 +2296,13 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'SetOtherPortFormat'
+        self.c_app_data.method = b'SetOtherPortFormat'
 
         if self.num_ports['Other'] <= 0:
-            print '%s: Component has no other-type port.' % self.name
+            print('%s: Component has no other-type port.' % self.name)
             return OMX_ErrorNone
 
-        for n in xrange(self.num_ports['Other']):
+        for n in range(self.num_ports['Other']):
             key = 'Other%d' % (n+1)
             if port_index != self.port_indices[key]:
                 continue
@@ -2258,7 +2320,7 @@ class omxComponent(object):
 
             return e
 
-        print '%s: Port %d is not an other-type port.' % (self.name, port_index)
+        print('%s: Port %d is not an other-type port.' % (self.name, port_index))
         return OMX_ErrorBadPortIndex
 
     #---------------------------------------------------------------------------
@@ -2277,7 +2339,7 @@ class omxComponent(object):
             <int>       Error code.
         """
 
-        self.c_app_data.method = 'SetBufferSupplier'
+        self.c_app_data.method = b'SetBufferSupplier'
 
         c_param = OMX_PARAM_BUFFERSUPPLIERTYPE()
         c_param.nPortIndex = port_index
@@ -2465,7 +2527,7 @@ class omxComponent(object):
                (self.name, num_ports, domain_name,
                 self.port_indices[domain_name+'1']))
 
-            for n in xrange(num_ports):
+            for n in range(num_ports):
                 key = '%s%d' % (domain_name, n+1)
                 port_index = self.port_indices[key]
                 e, c_port_def = self.GetPortDefinition(port_index)
@@ -1,7 +1,7 @@
 """
 Module Name: omxjpgdec.py
 Version: 1.2 (2014-10-19)
-Python Version: 2.7.3
+Python Version: 2.7.3, 3.x
 Platform: Raspberry Pi
 
 An OpenMAX JPEG Decoder
@@ -16,11 +16,39 @@ Redistribution and use in source and binary forms, with or without
 modification, are permitted.
 """
 
+from __future__ import division, print_function
+
 from omxilc import *
+import logging
+import mmap
 import os
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue       # Python 2
 
 ILC_TIMEOUT = 250   # default time-out in ms
 
+logger = logging.getLogger('omxjpgdec')
+
+# Bytes per pixel of the supported output color formats.
+_BYTES_PER_PIXEL = {
+        OMX_COLOR_FormatYUV420PackedPlanar: 1,
+        OMX_COLOR_Format16bitRGB565: 2,
+        OMX_COLOR_Format32bitABGR8888: 4}
+
+#-------------------------------------------------------------------------------
+# C structure of a boolean port parameter, taken from Broadcom OMX_Broadcom.h.
+# It is used with OMX_IndexParamBrcmZeroCopy.
+
+class OMX_CONFIG_PORTBOOLEANTYPE(ctypes.Structure):
+    _fields_ = [('nSize', OMX_U32),
+                ('nVersion', OMX_VERSIONTYPE),
+                ('nPortIndex', OMX_U32),
+                ('bEnabled', OMX_BOOL)]
+
 #===============================================================================
 # OpenMAX JPEG Decoder Class
 #===============================================================================
@@ -28,11 +56,24 @@ ILC_TIMEOUT = 250   # default time-out in ms
 class JPEGDecoder(object):
     """OpenMAX JPEG Decoder Class"""
 
+    __slots__ = ('out_width', 'out_height', 'out_format',
+                 'in_width', 'in_height', 'timeout', 'name', 'alt_setup',
+                 'ready', 'setup_complete', 'in_buf_size', 'out_buf_size',
+                 'decoder', 'resizer', 'renderer',
+                 'decoder_in_port', 'decoder_out_port',
+                 'resizer_in_port', 'resizer_out_port', 'renderer_in_port',
+                 'cpp_in_buf', 'cpp_out_buf', 'num_in_buf', 'num_out_buf',
+                 'out_buf_index', 'out_callback',
+                 '_in_hdrs', '_out_hdrs', '_in_privs', '_out_privs',
+                 '_in_bufs', '_buf_ready', '_fill_done', '_out_queue',
+                 '_out_returned',
+                 '_drain_thread', '_closing')
+
     def __init__(self, out_width=1920, out_height=1080,
                  out_format=OMX_COLOR_Format32bitABGR8888,
                  in_width=1920, in_height=1080,
                  timeout=ILC_TIMEOUT, name='jpeg_decoder',
-                 alt_setup=0):
+                 alt_setup=0, render=None, out_callback=None):
         """
         Jpeg Decoder Class Constructor
 
@@ -45,6 +86,15 @@ class JPEGDecoder(object):
             timeout         <int>   Time-out in ms (optional).
             name            <str>   Name of JPEG decoder (optional).
             alt_setup       <int>   Alternate setup is used if not 0 (optional).
+            render          <str>   Name of render component, e.g.
+                                    'video_render' or 'egl_render', to tunnel
+                                    the resizer output to. No resizer output
+                                    buffers are allocated if given (optional).
+            out_callback    <func>  Function called by ConvertFromFile with
+                                    the output buffer holding the converted
+                                    image and its index, as
+                                    out_callback(c_out_buf, buffer_index)
+                                    (optional).
         """
 
         # Save initialization parameters.
@@ -56,27 +106,27 @@ class JPEGDecoder(object):
         self.timeout = timeout
         self.name = name
         self.alt_setup = alt_setup
+        self.renderer = None
+        self._drain_thread = None
+        self._closing = False
+        self.out_buf_index = -1     # Output buffer with the converted image.
+        self.out_callback = out_callback
 
         self.ready = False
         self.setup_complete = False # Set up is partially complete.
 
         # Compute size of decoder input buffer.
-        w = ((in_width + 15)/16)*16     # Round up to multiples of 16.
-        h = ((in_height + 15)/16)*16
-        self.in_buf_size = (w*h)/32
+        w = (in_width + 15) & ~15       # Round up to multiples of 16.
+        h = (in_height + 15) & ~15
+        self.in_buf_size = (w*h) >> 5
 
         # Compute size of resizer output buffer.
-        w = ((out_width + 15)/16)*16    # Round up to multiples of 16.
-        h = ((out_height + 15)/16)*16
-        sz = w*h
-        if out_format == OMX_COLOR_FormatYUV420PackedPlanar:
-            self.out_buf_size = sz
-        elif out_format == OMX_COLOR_Format16bitRGB565:
-            self.out_buf_size = sz*2
-        elif out_format == OMX_COLOR_Format32bitABGR8888:
-            self.out_buf_size = sz*4
-        else:
-            print ('%s__init__: Unsupported output color format.' %
+        w = (out_width + 15) & ~15      # Round up to multiples of 16.
+        h = (out_height + 15) & ~15
+        try:
+            self.out_buf_size = w*h*_BYTES_PER_PIXEL[out_format]
+        except KeyError:
+            print('%s__init__: Unsupported output color format.' %
                 self.name)
             return
 
@@ -92,30 +142,61 @@ class JPEGDecoder(object):
 
         # Ensure that both components are created.
         if not self.decoder.c_handle or not self.resizer.c_handle:
-            print ('%s.__init__: Required component(s) not created.' %
+            print('%s.__init__: Required component(s) not created.' %
                 self.name)
             return
 
         # Get input and output port indices of components.
         num_ports = 0
-        if 'Image1' in self.decoder.in_port_indices:
-            self.decoder_in_port = self.decoder.in_port_indices['Image1']
-            num_ports += 1
-        if 'Image1' in self.decoder.out_port_indices:
-            self.decoder_out_port = self.decoder.out_port_indices['Image1']
-            num_ports += 1
-        if 'Image1' in self.resizer.in_port_indices:
-            self.resizer_in_port = self.resizer.in_port_indices['Image1']
-            num_ports += 1
-        if 'Image1' in self.resizer.out_port_indices:
-            self.resizer_out_port = self.resizer.out_port_indices['Image1']
+        for comp_name, port_dir in (('decoder', 'in'), ('decoder', 'out'),
+                                    ('resizer', 'in'), ('resizer', 'out')):
+            comp = getattr(self, comp_name)
+            port_index = getattr(comp, port_dir + '_port_indices').get('Image1')
+            if port_index is None:
+                break
+            setattr(self, '%s_%s_port' % (comp_name, port_dir), port_index)
             num_ports += 1
 
         # Ensure that there are 4 ports.
         if num_ports != 4:
-            print ('%s.__init__: Less than 4 ports found.' % self.name)
+            print('%s.__init__: Less than 4 ports found.' % self.name)
             return
 
+        # Create render component if the resizer output is to be tunnelled.
+        if render:
+            self.renderer = omxComponent(name=render,
+                    flags=ILCLIENT_DISABLE_ALL_PORTS,
+                    timeout=timeout)
+            if not self.renderer.c_handle:
+                print('%s.__init__: Render component not created.' %
+                    self.name)
+                return
+            if 'Video1' not in self.renderer.in_port_indices:
+                print('%s.__init__: Render input port not found.' % self.name)
+                return
+            self.renderer_in_port = self.renderer.in_port_indices['Video1']
+
+        # Event set by component callbacks whenever a buffer is returned or an
+        # event is received, so that conversion can block instead of polling.
+        self._buf_ready = threading.Event()
+        self.decoder.on_event = self.SignalBufferReady
+        self.decoder.on_empty_done = self.SignalBufferReady
+        self.resizer.on_event = self.SignalBufferReady
+
+        # Event set when a resizer output buffer is filled, or when the output
+        # drain thread should send free buffers to the resizer.
+        self._fill_done = threading.Event()
+
+        # Queue of indices of filled resizer output buffers.
+        self._out_queue = queue.Queue()
+
+        # Queue of (index, filled) of buffers returned by the resizer, filled
+        # or not, for the output drain thread.
+        self._out_returned = queue.Queue()
+        self.resizer.on_fill_done = self.resizerFillBufferDone
+        if self.renderer is not None:
+            self.renderer.on_event = self.SignalBufferReady
+
         # Set up JPEG decoder.
         self.Setup()
 
@@ -130,12 +211,25 @@ class JPEGDecoder(object):
 
         e = 0
 
+        # Stop output drain thread.
+        if self._drain_thread is not None:
+            self._closing = True
+            self._fill_done.set()
+            self._drain_thread.join()
+            self._drain_thread = None
+
+        # Remove resizer-renderer tunnel if it was placed.
+        if self.renderer is not None:
+            e |= self.resizer.RemoveOutTunnel(self.renderer)
+
         # Remove decoder-resizer tunnel if it was placed.
         e |= self.decoder.RemoveOutTunnel(self.resizer)
 
-        # Close decoder and resizer.
+        # Close decoder, resizer and renderer.
         e |= self.decoder.Close()
         e |= self.resizer.Close()
+        if self.renderer is not None:
+            e |= self.renderer.Close()
 
         return e
 
@@ -160,7 +254,7 @@ class JPEGDecoder(object):
             e |= self.decoder.ChangeState(OMX_StateLoaded, self.timeout)
 
         if self.resizer.c_app_data.current_state != OMX_StateLoaded:
-            if self.resizer.c_app_data.current != OMX_StateIdle:
+            if self.resizer.c_app_data.current_state != OMX_StateIdle:
                 e |= self.resizer.ChangeState(OMX_StateIdle, self.timeout)
             e |= self.resizer.ChangeState(OMX_StateLoaded, self.timeout)
 
@@ -185,10 +279,20 @@ class JPEGDecoder(object):
             if sz != self.in_buf_size:
                 self.in_buf_size = sz
 
+        # Cache decoder input buffers, buffer headers and their private
+        # structures.
+        self._in_bufs = [self.cpp_in_buf[n][0] for n in range(self.num_in_buf)]
+        cpp_buf_hdr = self.decoder.c_app_data.pp_in_buf_hdr
+        self._in_hdrs = [cpp_buf_hdr[n] for n in range(self.num_in_buf)]
+        self._in_privs = [ctypes.cast(cp[0].pAppPrivate, pBUFHDR_APPT)[0]
+                          for cp in self._in_hdrs]
+
         # Alternate set up stops here.
         if self.alt_setup:
             # Buffers for resizer output port has not been allocated.
             self.num_out_buf = 0
+            self._out_hdrs = []
+            self._out_privs = []
 
         else:
             # Modify settings of resizer output port.
@@ -202,15 +306,16 @@ class JPEGDecoder(object):
             e |= self.resizer.ChangeState(OMX_StateIdle, self.timeout)
 
             # Enable resizer output buffers.
-            ec, self.cpp_out_buf = self.resizer.EnableBuffers(
-                    self.resizer_out_port,
-                    self.out_buf_size)
-            e |= ec
-            self.num_out_buf = len(self.cpp_out_buf)
-            if ec == OMX_ErrorNone:
-                sz = len(self.cpp_out_buf[0][0])
-                if sz != self.out_buf_size:
-                    self.out_buf_size = sz
+            e |= self.resizerEnableOutBuffers()
+
+        # Start output drain thread. Output buffers of the alternate set up
+        # are picked up by the thread once they are enabled.
+        if ((e == OMX_ErrorNone) and (self.renderer is None) and
+                (self._drain_thread is None)):
+            self._drain_thread = threading.Thread(
+                    target=self.resizerDrainOutBuffers)
+            self._drain_thread.daemon = True
+            self._drain_thread.start()
 
         # Set ready flag.
         if e == OMX_ErrorNone:
@@ -251,6 +356,40 @@ class JPEGDecoder(object):
         # Resizer output port should generate a settings changed event.
         self.resizer.WaitForPortSettingsChanged(self.resizer_out_port)
 
+        # Tunnel resizer output to renderer if one is used.
+        if self.renderer is not None:
+            e |= self.SetupRenderTunnel()
+
+        return e
+
+    #---------------------------------------------------------------------------
+    def SetupRenderTunnel(self):
+        """
+        Set up a tunnel between the resizer output and the renderer input so
+        that decoded frames are passed to the renderer without being copied
+        to application buffers.
+
+        Return value:
+            <int>       Error code: 0 for success, not 0 for failure.
+        """
+
+        # Let both ports of the tunnel share buffers.
+        e = self.SetZeroCopy(self.resizer, self.resizer_out_port)
+        e |= self.SetZeroCopy(self.renderer, self.renderer_in_port)
+
+        # Place resizer-renderer tunnel.
+        e |= self.resizer.PlaceOutTunnel(self.resizer_out_port,
+                self.renderer, self.renderer_in_port)
+
+        # Move renderer to state Idle.
+        e |= self.renderer.ChangeState(OMX_StateIdle, self.timeout)
+
+        # Enable resizer-renderer tunnel.
+        e |= self.resizer.EnableOutTunnel(self.renderer)
+
+        # Move renderer to state Executing.
+        e |= self.renderer.ChangeState(OMX_StateExecuting, self.timeout)
+
         return e
 
     #---------------------------------------------------------------------------
@@ -284,18 +423,62 @@ class JPEGDecoder(object):
         e |= self.SetupTunnel()
 
         # Enable resizer output buffers.
-        ec, self.cpp_out_buf = self.resizer.EnableBuffers(
-                self.resizer_out_port,
-                self.out_buf_size)
-        e |= ec
-        self.num_out_buf = len(self.cpp_out_buf)
-        if ec == OMX_ErrorNone:
-            sz = len(self.cpp_out_buf[0][0])
-            if sz != self.out_buf_size:
-                self.out_buf_size = sz
+        e |= self.resizerEnableOutBuffers()
 
         return e
 
+    #---------------------------------------------------------------------------
+    def resizerEnableOutBuffers(self):
+        """
+        Enable the resizer output buffers and cache their headers and private
+        structures. No buffers are enabled if a renderer is used.
+
+        Return value:
+            <int>       Error code: 0 for success, not 0 for failure.
+        """
+
+        e = 0
+
+        if self.renderer is not None:
+            self.num_out_buf = 0
+        else:
+            e, self.cpp_out_buf = self.resizer.EnableBuffers(
+                    self.resizer_out_port,
+                    self.out_buf_size)
+            self.num_out_buf = len(self.cpp_out_buf)
+            if e == OMX_ErrorNone:
+                sz = len(self.cpp_out_buf[0][0])
+                if sz != self.out_buf_size:
+                    self.out_buf_size = sz
+
+        # Cache resizer output buffer headers and their private structures.
+        cpp_buf_hdr = self.resizer.c_app_data.pp_out_buf_hdr
+        self._out_hdrs = [cpp_buf_hdr[n] for n in range(self.num_out_buf)]
+        self._out_privs = [ctypes.cast(cp[0].pAppPrivate, pBUFHDR_APPT)[0]
+                           for cp in self._out_hdrs]
+
+        return e
+
+    #---------------------------------------------------------------------------
+    def SetZeroCopy(self, comp, port_index):
+        """
+        Enable zero-copy mode on a port of a component.
+
+        Parameters:
+            comp            <object>    Component.
+            port_index      <int>       Port index.
+
+        Return value:
+            <int>       Error code.
+        """
+
+        c_param = OMX_CONFIG_PORTBOOLEANTYPE()
+        c_param.nPortIndex = port_index
+        c_param.bEnabled = OMX_TRUE
+
+        return comp.SetParameter(OMX_IndexParamBrcmZeroCopy,
+                                 ctypes.pointer(c_param))
+
     #---------------------------------------------------------------------------
     def CopyPortDefinition(self, src_comp, src_port, dst_comp, dst_port):
         """
@@ -364,8 +547,6 @@ class JPEGDecoder(object):
             <int>       Error code: 0 for success, not 0 for failure.
         """
 
-        name = self.name + '.SetImagePortDefinition:'
-        
         if component_index == 0:
             comp = self.decoder
             if port_dir == 0:
@@ -379,7 +560,8 @@ class JPEGDecoder(object):
             else:
                 port_index = self.resizer_out_port
         else:
-            cons_print(name, 'Undefined component.')
+            logger.error('%s.SetImagePortDefinition: Undefined component.',
+                         self.name)
             return 1
 
         e, c_port_def = comp.GetPortDefinition(port_index)
@@ -387,14 +569,16 @@ class JPEGDecoder(object):
             return e
 
         if c_port_def.eDomain != 2:
-            cons_print(name, 'Port %d is not an image port.' % port_index)
+            logger.error('%s.SetImagePortDefinition: '
+                         'Port %d is not an image port.', self.name, port_index)
             return 1
 
         n = 0
         m = 0
         if coding >= 0:
             if coding not in omx_image_coding_names:
-                cons_print(name, 'Unsupported image coding.')
+                logger.error('%s.SetImagePortDefinition: '
+                             'Unsupported image coding.', self.name)
                 return 1
             c_port_def.format.image.eCompressionFormat = coding
             n += 1
@@ -403,7 +587,8 @@ class JPEGDecoder(object):
             coding = c_port_def.format.image.eCompressionFormat
         if color >= 0:
             if color not in omx_color_format_names:
-                cons_print(name, 'Unsupported color format.')
+                logger.error('%s.SetImagePortDefinition: '
+                             'Unsupported color format.', self.name)
                 return 1
             c_port_def.format.image.eColorFormat = color
             n += 1
@@ -427,16 +612,13 @@ class JPEGDecoder(object):
             return 0
 
         if n > m:
-            c_port_def.format.image.nSliceHeight = ((height + 15)/16)*16
-            w = ((width + 15)/16)*16
-            if color == OMX_COLOR_FormatYUV420PackedPlanar:
-                c_port_def.format.image.nStride = w
-            elif color == OMX_COLOR_Format16bitRGB565:
-                c_port_def.format.image.nStride = w*2
-            elif color == OMX_COLOR_Format32bitABGR8888:
-                c_port_def.format.image.nStride = w*4
-            else:
-                cons_print(name, 'Unsupported color format.')
+            c_port_def.format.image.nSliceHeight = (height + 15) & ~15
+            w = (width + 15) & ~15
+            try:
+                c_port_def.format.image.nStride = w*_BYTES_PER_PIXEL[color]
+            except KeyError:
+                logger.error('%s.SetImagePortDefinition: '
+                             'Unsupported color format.', self.name)
                 return 1
             e = comp.SetPortDefinition(port_index, ctypes.pointer(c_port_def))
         else:
@@ -500,22 +682,82 @@ class JPEGDecoder(object):
             # Resizer output port should generate a settings change event.
             self.resizer.WaitForPortSettingsChanged(self.resizer_out_port)
 
+            # Re-negotiate resizer-renderer tunnel with the new settings.
+            if self.renderer is not None:
+                e |= self.resizer.DisableOutTunnel(self.renderer)
+                e |= self.resizer.EnableOutTunnel(self.renderer)
+
         return e
 
+    #---------------------------------------------------------------------------
+    def SignalBufferReady(self, *args):
+        """
+        Callback function for components to wake up a waiting conversion.
+        """
+
+        self._buf_ready.set()
+
+    #---------------------------------------------------------------------------
+    def resizerFillBufferDone(self, port_index, buffer_index, filled_len):
+        """
+        Callback function for the resizer when an output buffer is returned.
+
+        Parameters:
+            port_index      <int>       Index of port that returned buffer.
+            buffer_index    <int>       Index of buffer returned.
+            filled_len      <int>       Number of bytes filled (0 if empty).
+        """
+
+        if port_index == self.resizer_out_port:
+            self._out_returned.put((buffer_index, filled_len > 0))
+            self._fill_done.set()
+        self._buf_ready.set()
+
+    #---------------------------------------------------------------------------
+    def resizerDrainOutBuffers(self):
+        """
+        Output drain thread. Each time it is woken up, send free resizer output
+        buffers to the resizer and put the indices of filled ones in the output
+        queue, until the JPEG decoder is closed.
+        """
+
+        queued = []     # Buffers sent to the resizer and not yet returned.
+
+        while True:
+            self._fill_done.wait()
+            self._fill_done.clear()
+            if self._closing:
+                break
+
+            out_bufs = list(zip(self._out_hdrs, self._out_privs))
+            if len(queued) != len(out_bufs):
+                queued = [False]*len(out_bufs)
+
+            # A returned buffer is owned by the application again, whether it
+            # was filled or came back empty (e.g. after a flush).
+            while not self._out_returned.empty():
+                n, filled = self._out_returned.get_nowait()
+                if n < len(queued):
+                    queued[n] = False
+                if filled:
+                    self._out_queue.put(n)
+
+            for n, (cp_out_buf_hdr, c_out_buf_prv) in enumerate(out_bufs):
+                if c_out_buf_prv.buffer_free and not queued[n]:
+                    queued[n] = True
+                    if self.resizer.FillThisBuffer(cp_out_buf_hdr):
+                        queued[n] = False
+
     #---------------------------------------------------------------------------
     def FreeIOBuffers(self):
         """
         Make all input and output buffers available.
         """
 
-        for n in range(self.num_in_buf):
-            c_in_buf_hdr = self.decoder.c_app_data.pp_in_buf_hdr[n][0]
-            c_in_buf_prv = ctypes.cast(c_in_buf_hdr.pAppPrivate, pBUFHDR_APPT)[0]
+        for c_in_buf_prv in self._in_privs:
             c_in_buf_prv.buffer_free = 1
 
-        for n in range(self.num_out_buf):
-            c_out_buf_hdr = self.resizer.c_app_data.pp_out_buf_hdr[n][0]
-            c_out_buf_prv = ctypes.cast(c_out_buf_hdr.pAppPrivate, pBUFHDR_APPT)[0]
+        for c_out_buf_prv in self._out_privs:
             c_out_buf_prv.buffer_free = 1
 
     #---------------------------------------------------------------------------
@@ -524,6 +766,13 @@ class JPEGDecoder(object):
         Convert a JPEG image file to the specified color format and resize the
         converted image to the specified dimensions.
 
+        Resizer output buffers are used in turn, so the converted image is not
+        always in the same buffer. On success, out_buf_index holds the index
+        of the buffer with the image, i.e. cpp_out_buf[out_buf_index][0], and
+        out_callback, if given, is called with that buffer and its index
+        before returning. The buffer stays valid until the next conversion.
+        Neither applies when the resizer output is tunnelled to a renderer.
+
         Return value:
             <int>       Error code: 0 for failure, file size for success.
         """
@@ -531,86 +780,144 @@ class JPEGDecoder(object):
         e = 0
 
         if not self.ready:
-            print ('%s: Not ready.' % self.name)
+            print('%s: Not ready.' % self.name)
             return 0
 
         try:
-            f = open(file_name)
-        except IOError:
-            print ('File %s not found.' % file_name)
+            fd = os.open(file_name, os.O_RDONLY)
+        except OSError:
+            print('File %s not found.' % file_name)
             return 0
 
-        f_size = os.path.getsize(file_name)
-        if f_size <= 0:
-            f.close()
+        # Map the file into memory so that each chunk is copied directly from
+        # the page cache to a decoder input buffer. A copy-on-write mapping is
+        # used since ctypes can only take the address of a writable buffer.
+        try:
+            f_size = os.fstat(fd).st_size
+            if f_size <= 0:
+                return 0
+            mm = mmap.mmap(fd, f_size, access=mmap.ACCESS_COPY)
+        except (EnvironmentError, ValueError):
+            print('File %s cannot be read.' % file_name)
             return 0
+        finally:
+            os.close(fd)
+
+        # The file is read once from start to end, so let the kernel read
+        # ahead aggressively (Python 3.8+ on Unix).
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
 
-        with f:
+        c_file = (ctypes.c_char*f_size).from_buffer(mm)
+        mm_addr = ctypes.addressof(c_file)
+
+        try:
             cons_print('%s: Converting file %s (%d bytes) to %s...' %
                 (self.name, file_name, f_size, omx_color_format_names[self.out_format]))
 
             self.FreeIOBuffers()
             self.decoder.ResetCallbackPortFlags()
             self.resizer.ResetCallbackPortFlags()
-            
-            c_dec_dat = self.decoder.c_app_data
+            if self.renderer is not None:
+                self.renderer.ResetCallbackPortFlags()
+
+            # Discard output buffers left over from a failed conversion.
+            while not self._out_queue.empty():
+                self._out_queue.get_nowait()
+
             c_rsz_dat = self.resizer.c_app_data
 
-            to_read = f_size
-            while to_read > 0:
+            # Bind frequently used attributes and methods to local names.
+            in_bufs = list(zip(self._in_hdrs, self._in_bufs, self._in_privs))
+            in_buf_size = self.in_buf_size
+            empty_buffer = self.decoder.EmptyThisBuffer
+            handle_settings_changed = self.decoderHandleOutSettingsChanged
+            buf_ready = self._buf_ready
+            fill_done = self._fill_done
+            memmove = ctypes.memmove
+
+            # Split the file into chunks of input buffer size. Only the last
+            # chunk is flagged as end of stream.
+            num_chunks = (f_size + in_buf_size - 1) // in_buf_size
+            last_chunk = num_chunks - 1
+            chunk = 0
+            while chunk < num_chunks:
+                buf_ready.clear()
+
+                # Queue all free input buffers to the decoder.
                 n_ibuf_used = 0
-                for n in range(self.num_in_buf):
-                    cp_in_buf_hdr = c_dec_dat.pp_in_buf_hdr[n]
-                    c_in_buf_prv = ctypes.cast(cp_in_buf_hdr[0].pAppPrivate, pBUFHDR_APPT)[0]
+                for cp_in_buf_hdr, c_in_buf, c_in_buf_prv in in_bufs:
 
                     if not c_in_buf_prv.buffer_free:
                         continue
                     c_in_buf_prv.buffer_free = 0
                     n_ibuf_used += 1
 
-                    c_in_buf = self.cpp_in_buf[n][0]
-                    n_read = f.readinto(c_in_buf)
-                    if n_read <= 0:
-                        break
-                    to_read -= n_read
+                    offset = chunk*in_buf_size
+                    n_copy = min(in_buf_size, f_size - offset)
+                    memmove(c_in_buf, mm_addr + offset, n_copy)
 
-                    cp_in_buf_hdr[0].nFilledLen = n_read
-                    cp_in_buf_hdr[0].nOffset = 0
-                    if to_read > 0:
-                        cp_in_buf_hdr[0].nFlags = 0
+                    c_in_buf_hdr = cp_in_buf_hdr[0]
+                    c_in_buf_hdr.nFilledLen = n_copy
+                    c_in_buf_hdr.nOffset = 0
+                    if chunk == last_chunk:
+                        c_in_buf_hdr.nFlags = OMX_BUFFERFLAG_EOS
                     else:
-                        cp_in_buf_hdr[0].nFlags = OMX_BUFFERFLAG_EOS
-                    self.decoder.EmptyThisBuffer(cp_in_buf_hdr)
-
-                    if self.decoderHandleOutSettingsChanged():
-                        return 0
-
-                    if self.num_out_buf > 0:
-                        cp_out_buf_hdr = c_rsz_dat.pp_out_buf_hdr[0]
-#                        c_out_buf_prv = ctypes.cast(cp_out_buf_hdr[0].pAppPrivate, pBUFHDR_APPT)[0]
-                        self.resizer.FillThisBuffer(cp_out_buf_hdr)
+                        c_in_buf_hdr.nFlags = 0
+                    empty_buffer(cp_in_buf_hdr)
 
-                    if to_read <= 0:
+                    chunk += 1
+                    if chunk == num_chunks:
                         break
 
-                if self.decoderHandleOutSettingsChanged():
+                if handle_settings_changed():
                     return 0
-                
+
                 if n_ibuf_used <= 0:
-                    time.sleep(0.001)
+                    buf_ready.wait(0.010)
+                    continue
+
+                # Wake the output drain thread to send free output buffers to
+                # the resizer.
+                fill_done.set()
 
-            timer = 0
-            while ((c_rsz_dat.port_eos != self.resizer_out_port) and
-                   (timer < 1000)):
+            # End of stream is detected by the last component of the pipeline.
+            if self.renderer is not None:
+                c_eos_dat = self.renderer.c_app_data
+                eos_port = self.renderer_in_port
+            else:
+                c_eos_dat = c_rsz_dat
+                eos_port = self.resizer_out_port
+
+            t_end = time.time() + 1.0
+            while ((c_eos_dat.port_eos != eos_port) and
+                   (time.time() < t_end)):
+                self._buf_ready.clear()
                 if self.decoderHandleOutSettingsChanged():
                     return 0
-                time.sleep(0.001)
-                timer += 1
-            if c_rsz_dat.port_eos != self.resizer_out_port:
+                if c_eos_dat.port_eos != eos_port:
+                    self._buf_ready.wait(0.010)
+            if c_eos_dat.port_eos != eos_port:
                 return 0
 
-            if self.resizer.WaitForBufferFilled(self.resizer_out_port, self.timeout):
-                return 0
+            # Frames tunnelled to the renderer are not returned in buffers.
+            if self.renderer is None:
+                try:
+                    self.out_buf_index = self._out_queue.get(
+                            timeout=self.timeout/1000.0)
+                except queue.Empty:
+                    cons_print('%s: Port %d buffer not filled after %d ms.' %
+                        (self.name, self.resizer_out_port, self.timeout))
+                    return 0
+
+                if self.out_callback is not None:
+                    self.out_callback(self.cpp_out_buf[self.out_buf_index][0],
+                                      self.out_buf_index)
+
+        finally:
+            # Release the exported buffer before unmapping the file.
+            del c_file
+            mm.close()
 
         cons_print('%s: Conversion successful.' % self.name)
         return f_size
@@ -622,7 +929,7 @@ if __name__ == '__main__':
     import sys
 
     if len(sys.argv) < 2:
-        print 'Usage: %s <jpgfile> [iterations]' % sys.argv[0]
+        print('Usage: %s <jpgfile> [iterations]' % sys.argv[0])
         sys.exit(2)
     fn = sys.argv[1]
     if len(sys.argv) < 3:
@@ -636,11 +943,12 @@ if __name__ == '__main__':
     for n in range(num_frames):
         if not jpg_dec.ConvertFromFile(fn):
             break
-        print n+1
+        # The converted image is in jpg_dec.cpp_out_buf[jpg_dec.out_buf_index].
+        print(n+1, jpg_dec.out_buf_index)
     t2 = time.time()
     dt = t2 - t1
-    print 'Elapsed time: %.3f s' % dt
-    print 'Frames/sec: %.3f' % (num_frames/dt)
+    print('Elapsed time: %.3f s' % dt)
+    print('Frames/sec: %.3f' % (num_frames/dt))
 
     jpg_dec.Close()
 